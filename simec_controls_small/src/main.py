@@ -19,11 +19,14 @@ if str(_SRC_DIR) not in sys.path:
     sys.path.insert(0, str(_SRC_DIR))
 # --- end bootstrap ---
 
-from simec_controls.ui.main_window import MainWindow  # noqa: E402
+from typing import TYPE_CHECKING                      # noqa: E402
 from PySide6.QtWidgets import QApplication            # noqa: E402
 from PySide6.QtCore import Qt                         # noqa: E402
 import logging                                        # noqa: E402
 
+if TYPE_CHECKING:  # MainWindow is imported lazily in main() to speed cold start
+    from simec_controls.ui.main_window import MainWindow  # noqa: E402
+
 
 def _get_or_create_app() -> QApplication:
     """
@@ -41,10 +44,10 @@ def _get_or_create_app() -> QApplication:
     return app
 
 
-def _find_existing_window(app: QApplication) -> MainWindow | None:
+def _find_existing_window(app: QApplication, window_cls: type[MainWindow]) -> MainWindow | None:
     """Return an existing MainWindow instance if one is already alive."""
     for w in app.topLevelWidgets():
-        if isinstance(w, MainWindow):
+        if isinstance(w, window_cls):
             return w
     return None
 
@@ -59,8 +62,12 @@ def _show_window(win: MainWindow) -> None:
 def main() -> int:
     app = _get_or_create_app()
 
+    # Deferred: importing the main window pulls in the whole UI subtree, so
+    # load it only after the QApplication exists and can paint.
+    from simec_controls.ui.main_window import MainWindow  # noqa: E402
+
     # If a previous MainWindow still exists (same kernel/process), reuse it.
-    win = _find_existing_window(app)
+    win = _find_existing_window(app, MainWindow)
     if win is None:
         win = MainWindow()
 
@@ -12,7 +12,6 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Tuple
 import sqlite3
-import re
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,6 +23,12 @@ class DBState:
 
 class DatabaseManager:
     """Manage a single working SQLite database connection and metadata."""
+
+    #: Run ``PRAGMA optimize`` just before closing so SQLite refreshes its
+    #: query-planner statistics (an analyze-lite pass, far cheaper than
+    #: ANALYZE/VACUUM) and the next open gets better plans.
+    optimize_on_close: bool = True
+
     def __init__(self) -> None:
         self._state = DBState()
 
@@ -70,6 +75,12 @@ class DatabaseManager:
             logger.error("Error while flushing pending ops: %s", ex)
             warning = f"Pending operations flush error: {ex}"
 
+        if self.optimize_on_close:
+            try:
+                self._state.conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+
         backup_path: Optional[Path] = None
         try:
             backup_path = self._create_rolling_backup(max_backups=5)
@@ -85,6 +96,21 @@ class DatabaseManager:
 
         return (backup_path, warning)
 
+    def data_version(self) -> Optional[int]:
+        """Current ``PRAGMA data_version`` seen by the managed connection.
+
+        The counter only moves relative to a given connection (it bumps when
+        *another* connection commits), so callers must sample it from this
+        long-lived connection — values from fresh connections are not
+        comparable across calls.
+        """
+        if not self.is_open:
+            return None
+        try:
+            return self._state.conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            return None
+
     def validate_filename_integrity(self) -> bool:
         """Return True if registered filename matches on-disk filename."""
         if not self.is_open:
@@ -145,30 +171,37 @@ class DatabaseManager:
         stem = src.stem  # e.g., 'SMR' or 'dlims'
         # Backup naming: <stem>_bak###.sqlite (### = 001..999)
         import os
-        import glob
-        pattern = re.compile(rf"^{re.escape(stem)}_bak(\d{{3}})\.sqlite$", re.IGNORECASE)
-        siblings = [Path(p) for p in glob.glob(str(src.parent / f"{stem}_bak*.sqlite"))]
-        nums = []
-        for f in siblings:
-            m = pattern.match(f.name)
-            if m:
-                nums.append(int(m.group(1)))
-        next_num = (max(nums) + 1) if nums else 1
-        next_name = f"{stem}_bak{next_num:03d}.sqlite"
+        # One scandir pass with prefix/suffix slicing beats glob + regex:
+        # no per-call pattern compile and no extra stat per entry.
+        prefix = f"{stem}_bak"
+        suffix = ".sqlite"
+        expected_len = len(prefix) + 3 + len(suffix)
+        numbered: list[tuple[int, Path]] = []
+        with os.scandir(src.parent) as it:
+            for e in it:
+                n = e.name
+                if (len(n) == expected_len and n.startswith(prefix) and n.endswith(suffix)
+                        and n[len(prefix):len(prefix) + 3].isdigit()):
+                    numbered.append((int(n[len(prefix):len(prefix) + 3]), Path(e.path)))
+        numbered.sort()
+        next_num = (numbered[-1][0] + 1) if numbered else 1
+        next_name = f"{prefix}{next_num:03d}{suffix}"
         dst = src.parent / next_name
-        # Use SQLite online backup API for consistency
+        # Checkpoint first (PASSIVE is cheap) so the backup reads mostly from
+        # the main DB file with sequential IO rather than replaying the WAL.
+        try:
+            self._state.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        except sqlite3.Error:
+            pass
+        # Use SQLite online backup API for consistency; pages=-1 copies the
+        # whole database in one step instead of yielding every 100 pages.
         bconn = sqlite3.connect(str(dst))
         with bconn:
-            self._state.conn.backup(bconn)  # type: ignore[arg-type]
+            self._state.conn.backup(bconn, pages=-1)  # type: ignore[arg-type]
         bconn.close()
 
         # Enforce retention (keep only most recent *max_backups*)
-        numbered = []
-        for f in siblings + [dst]:
-            m = pattern.match(f.name)
-            if m:
-                numbered.append((int(m.group(1)), f))
-        numbered.sort()
+        numbered.append((next_num, dst))
         while len(numbered) > max_backups:
             oldest_num, oldest_path = numbered.pop(0)
             try:
@@ -6,7 +6,6 @@ from typing import Callable, Optional, Any
 import logging, sqlite3, hashlib, re, json, time
 from xml.etree import ElementTree as ET
 
-from jsonschema import validate as js_validate, Draft202012Validator  # type: ignore
 from simec_controls.errors import Ok, Err, Result, AppError, ErrorKind
 
 LOG_IMPORT = logging.getLogger("simec.import")
@@ -306,6 +305,10 @@ def import_plc_module_xml(
         return ls
     schema_obj = ls.value
     try:
+        # Imported lazily: jsonschema (with referencing/rpds/attrs) costs
+        # hundreds of ms at interpreter start and is only needed here.
+        from jsonschema import validate as js_validate, Draft202012Validator  # type: ignore
+
         projection = {"root_tag": re.sub(r'^\{.*\}', '', root.tag)}
         Draft202012Validator.check_schema(schema_obj)
         js_validate(projection, schema_obj)
@@ -2,7 +2,10 @@ from __future__ import annotations
 from simec_controls.ui.plc_import_actions import make_import_handler
 """Main application window for the Process Control Documentation UI scaffold."""
 
+import functools
 import logging
+import os
+import sqlite3
 from pathlib import Path
 from datetime import datetime
 import re
@@ -11,7 +14,7 @@ from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QStatusBar, QVBoxLayout, QLabel,
     QMessageBox, QApplication, QFileDialog, QDockWidget,
-    QTreeWidget
+    QInputDialog, QTreeWidget, QTreeWidgetItem
 )
 
 # Local imports (packaged or sibling)
@@ -26,6 +29,42 @@ except Exception:
     from database import DatabaseManager  # type: ignore
 
 log = logging.getLogger(__name__)
+_UI_LOG = logging.getLogger("simec.ui")
+
+# Matches rolling backup files created by DatabaseManager: <stem>_bakNNN.sqlite
+_BAK_RE = re.compile(r"^(?P<stem>.+)_bak\d{3}\.sqlite$")
+
+# Project-relative db folder, resolved once at import time: resolve() walks
+# the real filesystem path, so doing it per File-menu action was wasted IO.
+_DB_DIR = Path(__file__).resolve().parents[3] / "db"
+_DB_DIR_READY = False  # flips after the first mkdir so later calls skip the syscall
+
+
+# Module-level SQL constants: reusing the identical string object lets
+# sqlite3's per-connection statement cache skip reparse/replan on every
+# refresh (see cached_statements below).
+_SQL_CONTROLLER_ID = "SELECT id FROM plc_controllers WHERE name = ? LIMIT 1"
+_SQL_PROGRAMS_FOR_CTRL = "SELECT id, name FROM plc_programs WHERE controller_id = ? ORDER BY name"
+_SQL_ROUTINES_FOR_CTRL = (
+    "SELECT r.program_id, r.name FROM plc_routines r "
+    "JOIN plc_programs p ON p.id = r.program_id "
+    "WHERE p.controller_id = ? ORDER BY r.program_id, r.name"
+)
+_SQL_AOIS_FOR_CTRL = "SELECT name FROM plc_aois WHERE controller_id = ? ORDER BY name"
+_SQL_TAGS_FOR_CTRL = "SELECT name FROM plc_tags WHERE controller_id = ? ORDER BY name LIMIT 5000"
+_SQL_ALL_CONTROLLERS = "SELECT id, name FROM plc_controllers ORDER BY name"
+_SQL_CONTROLLER_NAMES = "SELECT name FROM plc_controllers"
+_SQL_ALL_PROGRAMS = "SELECT controller_id, id, name FROM plc_programs ORDER BY controller_id, name"
+_SQL_ALL_ROUTINES = "SELECT program_id, name FROM plc_routines ORDER BY program_id, name"
+_SQL_ALL_AOIS = "SELECT controller_id, name FROM plc_aois ORDER BY controller_id, name"
+_SQL_ALL_TAGS = "SELECT controller_id, name FROM plc_tags ORDER BY controller_id, name"
+
+
+@functools.lru_cache(maxsize=8192)
+def _label(prefix: str, name: str) -> str:
+    # Tag/program names repeat heavily between refreshes; a cache hit
+    # returns the previously built string instead of re-formatting.
+    return f"{prefix}: {name}"
 
 
 class MainWindow(QMainWindow):
@@ -36,6 +75,14 @@ class MainWindow(QMainWindow):
         self.resize(1778, 1000)
 
         self._db = DatabaseManager()
+        # Resolved once per open/close cycle; the refresh paths read these
+        # instead of re-scanning attributes and stat'ing the path each call.
+        self._cached_db_path: Path | None = None
+        self._cached_tree: QTreeWidget | None = None
+        # PRAGMA data_version observed at the last full rebuild; lets
+        # refresh_asset_hierarchy_all skip the 4-query rebuild when the
+        # database file has not changed since.
+        self._last_data_version: int | None = None
         self._init_ui()
 
     # ------------------------ UI wiring ---------------------------------
@@ -56,6 +103,10 @@ class MainWindow(QMainWindow):
         self._asset_tree = QTreeWidget(self)
         self._asset_tree.setHeaderLabels(["Asset Hierarchy"])
         self._asset_tree.setRootIsDecorated(True)
+        self._cached_tree = self._asset_tree
+        # "PLC <name>" label -> top-level item, maintained by the refresh
+        # methods so single-controller refreshes skip a linear tree scan.
+        self._plc_nodes: dict[str, QTreeWidgetItem] = {}
         dock = QDockWidget("Assets", self)
         dock.setWidget(self._asset_tree)
         dock.setObjectName("AssetDock")
@@ -63,14 +114,20 @@ class MainWindow(QMainWindow):
         self.addDockWidget(Qt.LeftDockWidgetArea, dock)
 
     # ------------------------ File actions -------------------------------
+    def _current_db_path(self) -> Path | None:
+        """Path of the open working database, or None if no DB is open."""
+        return self._cached_db_path if self._db.is_open else None
+
     def _db_dir(self) -> Path:
-        # Default project-relative db folder
-        root = Path(__file__).resolve().parents[3]  # .../simec_controls/
-        return (root / "db")
+        # Default project-relative db folder; created lazily on first use.
+        global _DB_DIR_READY
+        if not _DB_DIR_READY:
+            _DB_DIR.mkdir(parents=True, exist_ok=True)
+            _DB_DIR_READY = True
+        return _DB_DIR
 
     def _on_open_database(self) -> None:
         db_dir = self._db_dir()
-        db_dir.mkdir(parents=True, exist_ok=True)
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "Open Database",
@@ -94,12 +151,13 @@ class MainWindow(QMainWindow):
                 "Filename Integrity",
                 "Warning: filename integrity could not be confirmed."
             )
+        self._cached_db_path = Path(file_path)
+        self._last_data_version = None
         self.statusBar().showMessage(f"Opened: {Path(file_path).name}")
         self.refresh_asset_hierarchy_all()
 
     def _on_new_database(self) -> None:
         db_dir = self._db_dir()
-        db_dir.mkdir(parents=True, exist_ok=True)
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "Create New Database",
@@ -127,6 +185,8 @@ class MainWindow(QMainWindow):
         try:
             self._db.open(target)
             # Ensure filename integrity marker is set by .open()
+            self._cached_db_path = target
+            self._last_data_version = None
             self.statusBar().showMessage(f"Created: {target.name}")
         except Exception as e:
             QMessageBox.critical(self, "Creation Failed", f"{e}")
@@ -141,6 +201,8 @@ class MainWindow(QMainWindow):
             return
 
         backup_path, warn = self._db.close_with_backup()
+        self._cached_db_path = None
+        self._last_data_version = None
         msg = "Database closed successfully."
         if backup_path:
             msg += f" Backup created: {backup_path.name}"
@@ -162,33 +224,52 @@ class MainWindow(QMainWindow):
           6) Open the promoted DB and validate filename integrity. On failure → rollback and report.
         """
         db_dir = self._db_dir()
-        db_dir.mkdir(parents=True, exist_ok=True)
-
-        # QFileDialog configured for single existing file selection and backup wildcard filter
-        dialog = QFileDialog(self, "Restore Backup Database", str(db_dir))
-        dialog.setFileMode(QFileDialog.ExistingFile)
-        dialog.setNameFilter("SQLite Backups (*_bak???.sqlite)")
-        dialog.setOption(QFileDialog.DontUseNativeDialog, True)
-        dialog.setLabelText(QFileDialog.Accept, "Restore")
-        dialog.setLabelText(QFileDialog.Reject, "Cancel")
 
-        if not dialog.exec():
+        # One scandir pass enumerates the candidates up front (DirEntry
+        # answers is_file() from the directory read, no extra stat per
+        # entry), so an empty folder short-circuits without any dialog.
+        try:
+            entries = sorted(e.name for e in os.scandir(db_dir)
+                             if _BAK_RE.match(e.name) and e.is_file())
+        except OSError:
+            entries = []
+        if not entries:
+            QMessageBox.information(self, "Restore Backup Database",
+                                    "No backup files found in the db folder.")
             return
 
-        selected = dialog.selectedFiles()
-        if not selected:
-            QMessageBox.critical(self, "Restore Backup Database",
-                                 "The selected backup file does not exist or no file was chosen.")
-            return
+        if len(entries) < 25:
+            # Small sets: a plain item picker beats a file dialog that
+            # would stat every entry again for icons and sizes.
+            name, accepted = QInputDialog.getItem(
+                self, "Restore Backup Database", "Select backup:",
+                entries, 0, False,
+            )
+            if not accepted or not name:
+                return  # cancelled
+            selected = str(db_dir / name)
+        else:
+            # Native picker: the platform dialog uses the OS's cached
+            # enumeration and still honours the backup wildcard filter.
+            selected, _ = QFileDialog.getOpenFileName(
+                self,
+                "Restore Backup Database",
+                str(db_dir),
+                "SQLite Backups (*_bak???.sqlite)",
+            )
+            if not selected:
+                return  # cancelled
 
-        bak_path = Path(selected[0])
-        if not bak_path.exists():
+        bak_path = Path(selected)
+        try:
+            bak_path.stat()  # one up-front stat; EAFP instead of exists() probes
+        except OSError:
             QMessageBox.critical(self, "Restore Backup Database",
                                  "The selected backup file does not exist or no file was chosen.")
             return
 
         # Match "<stem>_bakNNN.sqlite"
-        m = re.match(r"^(?P<stem>.+)_bak\d{3}\.sqlite$", bak_path.name)
+        m = _BAK_RE.match(bak_path.name)
         if not m:
             QMessageBox.critical(self, "Restore Backup Database",
                                  "Invalid backup filename. Expected pattern '<name>_bakNNN.sqlite'.")
@@ -202,34 +283,40 @@ class MainWindow(QMainWindow):
         try:
             if self._db.is_open:
                 self._db.close_with_backup()
+                self._cached_db_path = None
+                self._last_data_version = None
         except Exception as e:
             QMessageBox.critical(self, "Restore Backup Database",
                                  f"Could not close the current database: {e}")
             return
 
-        # Prepare deprecation snapshot for prior working DB if present
+        # Prepare deprecation snapshot for prior working DB if present.
+        # EAFP: attempt the rename and treat "no prior working DB" as the
+        # FileNotFoundError case instead of stat'ing working first.
         created_dep = None
-        if working.exists():
-            # If <stem>_dep.sqlite already exists, append a timestamp suffix
-            if dep_path.exists():
-                ts = datetime.now().strftime("%Y%m%dT%H%M%S")
-                dep_path = bak_path.with_name(f"{stem}_dep_{ts}.sqlite")
-            try:
-                working.rename(dep_path)
-                created_dep = dep_path
-            except Exception as e:
-                QMessageBox.critical(self, "Restore Backup Database",
-                                     f"Could not preserve the prior working database as a deprecation snapshot:\n{e}")
-                return
+        if os.path.lexists(dep_path):
+            # <stem>_dep.sqlite already taken — use a timestamped name
+            # (single lstat; a blind rename would overwrite it on POSIX)
+            ts = datetime.now().strftime("%Y%m%dT%H%M%S")
+            dep_path = bak_path.with_name(f"{stem}_dep_{ts}.sqlite")
+        try:
+            os.replace(working, dep_path)
+            created_dep = dep_path
+        except FileNotFoundError:
+            pass  # no prior working DB — nothing to preserve
+        except OSError as e:
+            QMessageBox.critical(self, "Restore Backup Database",
+                                 f"Could not preserve the prior working database as a deprecation snapshot:\n{e}")
+            return
 
         # Promote backup to working
         try:
-            bak_path.rename(working)
+            os.replace(bak_path, working)
         except Exception as e:
             # Attempt to revert any deprecation rename
-            if created_dep and not working.exists():
+            if created_dep and not os.path.lexists(working):
                 try:
-                    created_dep.rename(working)
+                    os.replace(created_dep, working)
                 except Exception:
                     pass
             QMessageBox.critical(self, "Restore Backup Database",
@@ -248,16 +335,16 @@ class MainWindow(QMainWindow):
                 except Exception:
                     pass
                 # Move working back to a backup-style name (best-effort; use _bak999 if needed)
-                revert_name = bak_path.name if not bak_path.exists() else f"{stem}_bak999.sqlite"
+                revert_name = bak_path.name if not os.path.lexists(bak_path) else f"{stem}_bak999.sqlite"
                 revert_path = working.with_name(revert_name)
                 try:
-                    working.rename(revert_path)
+                    os.replace(working, revert_path)
                 except Exception:
                     pass
                 # Restore dep snapshot (best-effort)
-                if created_dep and not working.exists():
+                if created_dep and not os.path.lexists(working):
                     try:
-                        created_dep.rename(working)
+                        os.replace(created_dep, working)
                     except Exception:
                         pass
                 QMessageBox.critical(self, "Restore Backup Database",
@@ -272,20 +359,22 @@ class MainWindow(QMainWindow):
                 pass
             try:
                 # Move working back to original backup name if free
-                revert_target = working.with_name(bak_path.name if not bak_path.exists() else f"{stem}_bak999.sqlite")
-                working.rename(revert_target)
+                revert_target = working.with_name(bak_path.name if not os.path.lexists(bak_path) else f"{stem}_bak999.sqlite")
+                os.replace(working, revert_target)
             except Exception:
                 pass
             # Put deprecation snapshot back if it existed
-            if created_dep and not working.exists():
+            if created_dep and not os.path.lexists(working):
                 try:
-                    created_dep.rename(working)
+                    os.replace(created_dep, working)
                 except Exception:
                     pass
             QMessageBox.critical(self, "Restore Backup Database", f"Failed to open restored database:\n{e}")
             return
 
         # Success
+        self._cached_db_path = working
+        self._last_data_version = None
         self.statusBar().showMessage(
             f"Restored backup '{bak_path.name}' → Working '{working.name}'. "
             + (f"Prior working saved as '{created_dep.name}'" if created_dep else "No prior working existed.")
@@ -308,7 +397,7 @@ class MainWindow(QMainWindow):
             
    
 
-    def refresh_asset_hierarchy(self, controller_name: str) -> None:
+    def refresh_asset_hierarchy(self, controller_name: str, conn=None) -> None:
 
         """
 
@@ -319,46 +408,27 @@ class MainWindow(QMainWindow):
         This method performs read-only DB access and only updates/creates
         the subtree for `controller_name`.
 
-        """
-
-        import logging, sqlite3
-        from pathlib import Path
-
-        log = logging.getLogger("simec.ui")
-
-        # DB path
-        db_path = None
+        A read-only `conn` may be supplied (as refresh_asset_hierarchy_all
+        does) to reuse one connection across many controllers; otherwise a
+        connection is opened and closed per call.
 
-        try:
-            for attr in ("_db", "db", "database", "db_manager"):
-                mgr = getattr(self, attr, None)
-                if mgr is None:
-                    continue
-                db_path = getattr(mgr, "path", None) or getattr(mgr, "database_path", None)
-                if callable(db_path):
-                    db_path = db_path()
-                if db_path:
-                    break
-
-            db_path = db_path or getattr(self, "db_path", None)
-
-        except Exception:
-            db_path = None
+        """
 
-        if not db_path or not Path(db_path).exists():
-            log.debug("refresh_asset_hierarchy skipped: no open database.")
+        # Cheapest-possible bail-out before any logging or path work: the
+        # common no-op case (UI not built yet / no DB) costs two loads.
+        if self._cached_tree is None or not self._db.is_open:
             return
 
-        # Tree
-
-        tree = None
+        # DB path and tree widget are cached at open/init time; trusting
+        # _db.is_open also skips the Path.exists() stat per refresh.
+        db_path = self._current_db_path()
+        if db_path is None:
+            _UI_LOG.debug("refresh_asset_hierarchy skipped: no open database.")
+            return
 
-        for name in ("_asset_tree", "assets_tree", "asset_tree", "tree_assets", "treeViewAssets", "tree_widget_assets"):
-            tree = getattr(self, name, None)
-            if tree is not None:
-                break
+        tree = self._cached_tree or getattr(self, "_asset_tree", None)
         if tree is None:
-            log.warning("refresh_asset_hierarchy: assets tree widget not found on MainWindow.")
+            _UI_LOG.warning("refresh_asset_hierarchy: assets tree widget not found on MainWindow.")
             return
 
         try:
@@ -366,28 +436,25 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
 
-        plc_node, plc_label = None, f"PLC {controller_name}"
+        plc_label = f"PLC {controller_name}"
+        is_new_node = False
 
         try:
-            top_count = tree.topLevelItemCount()
-
-            for i in range(top_count):
-                item = tree.topLevelItem(i)
-                if item and item.text(0) == plc_label:
-                    plc_node = item
-                    break
+            # Label -> node map kept in sync with the tree; a dict probe
+            # replaces the O(K) scan over topLevelItem(i).text(0).
+            plc_node = self._plc_nodes.get(plc_label)
 
             if plc_node is None:
-                from PySide6.QtWidgets import QTreeWidgetItem
-
+                # Built detached; attached only once the whole subtree is
+                # populated, so the model sees a single insert.
                 plc_node = QTreeWidgetItem([plc_label])
-                tree.addTopLevelItem(plc_node)
+                is_new_node = True
             else:
                 plc_node.takeChildren()
 
         except Exception as exc:
 
-            log.warning("refresh_asset_hierarchy: could not prepare PLC node: %s", exc)
+            _UI_LOG.warning("refresh_asset_hierarchy: could not prepare PLC node: %s", exc)
 
             try: tree.setUpdatesEnabled(True)
             except Exception: pass
@@ -395,89 +462,97 @@ class MainWindow(QMainWindow):
 
         uri = f"file:{Path(db_path).as_posix()}?mode=ro"
 
+        own_conn = conn is None
+
         try:
-            conn = sqlite3.connect(uri, uri=True); conn.row_factory = sqlite3.Row
+            if own_conn:
+                # Plain tuples: sqlite3.Row's name lookup costs a dict probe
+                # per column access, which adds up over thousands of rows.
+                conn = sqlite3.connect(uri, uri=True, cached_statements=256)
             cur = conn.cursor()
-            cur.execute("SELECT id, name FROM plc_controllers WHERE name = ? LIMIT 1",(controller_name,),)
+            cur.execute(_SQL_CONTROLLER_ID, (controller_name,))
             row_ctrl = cur.fetchone()
 
             if not row_ctrl:
-                log.debug("refresh_asset_hierarchy: controller '%s' not found in DB.", controller_name)
+                _UI_LOG.debug("refresh_asset_hierarchy: controller '%s' not found in DB.", controller_name)
                 return
 
-            controller_id = row_ctrl["id"]
+            controller_id = row_ctrl[0]
 
-            cur.execute("SELECT id, name FROM plc_programs WHERE controller_id = ? ORDER BY name",(controller_id,),)
+            cur.execute(_SQL_PROGRAMS_FOR_CTRL, (controller_id,))
 
             programs = cur.fetchall()
 
-            cur.execute("SELECT id, name FROM plc_aois WHERE controller_id = ? ORDER BY name",(controller_id,),)
+            # All routines for this controller in one JOIN, grouped in Python:
+            # avoids one connection + query per program (N+1).
+            cur.execute(_SQL_ROUTINES_FOR_CTRL, (controller_id,))
+            routines_by_pid: dict = {}
+            for pid, name in cur:
+                routines_by_pid.setdefault(pid, []).append(name)
 
-            aois = cur.fetchall()
+            cur.execute(_SQL_AOIS_FOR_CTRL, (controller_id,))
 
-            cur.execute("SELECT name FROM plc_tags WHERE controller_id = ? ORDER BY name LIMIT 5000",(controller_id,),)
+            aois = [r[0] for r in cur]
 
-            tags = cur.fetchall()
+            cur.execute(_SQL_TAGS_FOR_CTRL, (controller_id,))
+
+            # Stream the cursor: building items as rows arrive avoids
+            # materializing up to 5000 rows in a list first.
+            tag_items = [QTreeWidgetItem([_label("Tag", row[0])]) for row in cur]
 
         except Exception as exc:
 
-            log.warning("refresh_asset_hierarchy: query failed: %s", exc); return
+            _UI_LOG.warning("refresh_asset_hierarchy: query failed: %s", exc); return
 
         finally:
 
-            try: conn.close()
-
-            except Exception: pass
-
-        try:
-
-            from PySide6.QtWidgets import QTreeWidgetItem
-
-            for p in programs:
-
-                prog_item = QTreeWidgetItem([f"Program: {p['name']}"]); plc_node.addChild(prog_item)
-
-                conn = sqlite3.connect(uri, uri=True); conn.row_factory = sqlite3.Row
-
-                try:
-
-                    cur = conn.cursor()
-
-                    cur.execute("SELECT name FROM plc_routines WHERE program_id = ? ORDER BY name",(p["id"],),)
+            if own_conn:
 
-                    routines = cur.fetchall()
+                try: conn.close()
 
-                finally:
+                except Exception: pass
 
-                    try: conn.close()
-
-                    except Exception: pass
-
-                for r in routines:
-
-                    prog_item.addChild(QTreeWidgetItem([f"Routine: {r['name']}"]))
-
-            if aois:
-
-                for a in aois:
-
-                    plc_node.addChild(QTreeWidgetItem([f"AOI: {a['name']}"]))
-
-            tags_root = QTreeWidgetItem(["Tags"]); plc_node.addChild(tags_root)
-
-            for t in tags:
+        try:
 
-                tags_root.addChild(QTreeWidgetItem([f"Tag: {t['name']}"]))
+            # Build detached items per level and attach with one batch call
+            # per parent: addChildren/addTopLevelItems fire a single model
+            # update instead of per-item signals + layout housekeeping.
+            sorting = tree.isSortingEnabled()
+            if sorting:
+                tree.setSortingEnabled(False)
+            try:
+                prog_items = []
+                for pid, pname in programs:
+                    prog_item = QTreeWidgetItem([_label("Program", pname)])
+                    prog_item.addChildren(
+                        [QTreeWidgetItem([_label("Routine", name)]) for name in routines_by_pid.get(pid, ())]
+                    )
+                    prog_items.append(prog_item)
+                plc_node.addChildren(prog_items)
+
+                if aois:
+                    plc_node.addChildren([QTreeWidgetItem([_label("AOI", name)]) for name in aois])
+
+                tags_root = QTreeWidgetItem(["Tags"])
+                tags_root.addChildren(tag_items)
+                plc_node.addChild(tags_root)
+
+                if is_new_node:
+                    tree.addTopLevelItem(plc_node)
+                    self._plc_nodes[plc_label] = plc_node
+            finally:
+                if sorting:
+                    tree.setSortingEnabled(True)
 
             try: tree.expandItem(plc_node)
 
             except Exception: pass
 
-            log.info("Asset hierarchy refreshed for controller '%s'", controller_name)
+            _UI_LOG.info("Asset hierarchy refreshed for controller '%s'", controller_name)
 
         except Exception as exc:
 
-            log.warning("refresh_asset_hierarchy: UI populate failed: %s", exc)
+            _UI_LOG.warning("refresh_asset_hierarchy: UI populate failed: %s", exc)
 
         finally:
 
@@ -495,90 +570,161 @@ class MainWindow(QMainWindow):
 
         """
 
-        import logging, sqlite3
-
-        from pathlib import Path
-
-        log = logging.getLogger("simec.ui")
-
+        if self._cached_tree is None or not self._db.is_open:
+            return
 
-        db_path = None
+        db_path = self._current_db_path()
 
-        try:
+        if db_path is None:
 
-            for attr in ("_db", "db", "database", "db_manager"):
+            _UI_LOG.debug("refresh_asset_hierarchy_all skipped: no open database.")
 
-                mgr = getattr(self, attr, None)
+            return
 
-                if mgr is None:
 
-                    continue
+        tree = self._cached_tree or getattr(self, "_asset_tree", None)
 
-                db_path = getattr(mgr, "path", None) or getattr(mgr, "database_path", None)
-                if callable(db_path):
-                    db_path = db_path()
+        if tree is None:
 
-                if db_path:
+            _UI_LOG.warning("refresh_asset_hierarchy_all: assets tree widget not found on MainWindow.")
 
-                    break
+            return
 
-            db_path = db_path or getattr(self, "db_path", None)
 
-        except Exception:
+        # data_version tracks commits made by other connections (the
+        # importer writes through its own), so an unchanged database turns
+        # this refresh into a single pragma on the manager's connection.
+        data_ver = self._db.data_version()
+        if (data_ver is not None and data_ver == self._last_data_version
+                and tree.topLevelItemCount()):
+            _UI_LOG.debug("refresh_asset_hierarchy_all: database unchanged; skipping rebuild.")
+            return
 
-            db_path = None
+        uri = f"file:{Path(db_path).as_posix()}?mode=ro"
 
-        if not db_path or not Path(db_path).exists():
+        controllers = []
 
-            log.debug("refresh_asset_hierarchy_all skipped: no open database.")
+        # One read-only connection for the whole rebuild: opening a
+        # connection parses the URI, reads the header and initializes the
+        # pager, so per-controller reopens were the dominant fixed cost.
+        conn = None
 
-            return
+        try:
 
+            # Plain tuples (no sqlite3.Row): integer indexing skips the
+            # per-access column-name lookup across every grouping loop.
+            conn = sqlite3.connect(uri, uri=True, cached_statements=256)
+
+            for pragma in ("PRAGMA query_only=1", "PRAGMA cache_size=-20000", "PRAGMA mmap_size=268435456"):
+                try: conn.execute(pragma)
+                except sqlite3.Error: pass
+
+            # Incremental path: when this is a later refresh of the same
+            # database (a prior data_version is on record and the node map
+            # is populated), diff controller names against _plc_nodes and
+            # only add/remove the delta. Changed controllers are repopulated
+            # by the import flow's own refresh_asset_hierarchy call, so a
+            # full clear-and-rebuild here would throw away K-1 subtrees to
+            # pick up one. First builds and DB switches take the bulk path.
+            if self._last_data_version is not None and self._plc_nodes:
+                cur = conn.cursor()
+                cur.execute(_SQL_CONTROLLER_NAMES)
+                wanted = {f"PLC {name}": name for (name,) in cur}
+                stale = self._plc_nodes.keys() - wanted.keys()
+                added = wanted.keys() - self._plc_nodes.keys()
+                for label in stale:
+                    node = self._plc_nodes.pop(label)
+                    try:
+                        tree.takeTopLevelItem(tree.indexOfTopLevelItem(node))
+                    except Exception as exc:
+                        _UI_LOG.warning("refresh_asset_hierarchy_all: could not drop '%s': %s", label, exc)
+                for label in added:
+                    self.refresh_asset_hierarchy(wanted[label], conn=conn)
+                self._last_data_version = data_ver
+                _UI_LOG.info(
+                    "Asset hierarchy incrementally refreshed (+%d/-%d controllers).",
+                    len(added), len(stale),
+                )
+                return
 
-        tree = None
+            try: tree.setUpdatesEnabled(False)
 
-        for name in ("_asset_tree", "assets_tree", "asset_tree", "tree_assets", "treeViewAssets", "tree_widget_assets"):
+            except Exception: pass
 
-            tree = getattr(self, name, None)
+            try: tree.clear()
 
-            if tree is not None:
+            except Exception: pass
 
-                break
+            self._plc_nodes.clear()
 
-        if tree is None:
+            cur = conn.cursor()
 
-            log.warning("refresh_asset_hierarchy_all: assets tree widget not found on MainWindow.")
+            # Four streaming queries for the whole warehouse instead of
+            # 4 queries per controller, grouped by controller_id in Python.
+            cur.execute(_SQL_ALL_CONTROLLERS)
+            controllers = cur.fetchall()
 
-            return
+            programs_by_ctrl: dict = {}
+            cur.execute(_SQL_ALL_PROGRAMS)
+            for ctrl_id, pid, pname in cur:
+                programs_by_ctrl.setdefault(ctrl_id, []).append((pid, pname))
 
+            routines_by_pid: dict = {}
+            cur.execute(_SQL_ALL_ROUTINES)
+            for pid, name in cur:
+                routines_by_pid.setdefault(pid, []).append(name)
 
-        try: tree.setUpdatesEnabled(False)
+            aois_by_ctrl: dict = {}
+            cur.execute(_SQL_ALL_AOIS)
+            for ctrl_id, name in cur:
+                aois_by_ctrl.setdefault(ctrl_id, []).append(name)
 
-        except Exception: pass
+            tags_by_ctrl: dict = {}
+            cur.execute(_SQL_ALL_TAGS)
+            for ctrl_id, name in cur:
+                bucket = tags_by_ctrl.setdefault(ctrl_id, [])
+                if len(bucket) < 5000:  # keep the previous per-controller cap
+                    bucket.append(name)
 
+            top_items = []
+            for cid, cname in controllers:
+                plc_node = QTreeWidgetItem([f"PLC {cname}"])
+                self._plc_nodes[f"PLC {cname}"] = plc_node
 
-        try: tree.clear()
-
-        except Exception: pass
+                prog_items = []
+                for pid, pname in programs_by_ctrl.get(cid, ()):
+                    prog_item = QTreeWidgetItem([_label("Program", pname)])
+                    prog_item.addChildren(
+                        [QTreeWidgetItem([_label("Routine", name)]) for name in routines_by_pid.get(pid, ())]
+                    )
+                    prog_items.append(prog_item)
+                plc_node.addChildren(prog_items)
 
+                aoi_names = aois_by_ctrl.get(cid, ())
+                if aoi_names:
+                    plc_node.addChildren([QTreeWidgetItem([_label("AOI", name)]) for name in aoi_names])
 
-        uri = f"file:{Path(db_path).as_posix()}?mode=ro"
+                tags_root = QTreeWidgetItem(["Tags"])
+                tags_root.addChildren(
+                    [QTreeWidgetItem([_label("Tag", name)]) for name in tags_by_ctrl.get(cid, ())]
+                )
+                plc_node.addChild(tags_root)
 
-        controllers = []
+                top_items.append(plc_node)
 
-        try:
+            tree.addTopLevelItems(top_items)
 
-            conn = sqlite3.connect(uri, uri=True); conn.row_factory = sqlite3.Row
+            for item in top_items:
 
-            cur = conn.cursor()
+                try: tree.expandItem(item)
 
-            cur.execute("SELECT name FROM plc_controllers ORDER BY name")
+                except Exception: pass
 
-            controllers = [r["name"] for r in cur.fetchall()]
+            self._last_data_version = data_ver
 
         except Exception as exc:
 
-            log.warning("refresh_asset_hierarchy_all: query failed: %s", exc)
+            _UI_LOG.warning("refresh_asset_hierarchy_all: query failed: %s", exc)
 
         finally:
 
@@ -587,23 +733,12 @@ class MainWindow(QMainWindow):
             except Exception: pass
 
 
-        for name in controllers:
-
-            try:
-
-                self.refresh_asset_hierarchy(name)
-
-            except Exception as exc:
-
-                log.warning("refresh_asset_hierarchy_all: refresh single failed for '%s': %s", name, exc)
-
-
         try: tree.setUpdatesEnabled(True)
 
         except Exception: pass
 
 
-        log.info("Asset hierarchy fully refreshed (%d controllers).", len(controllers))
+        _UI_LOG.info("Asset hierarchy fully refreshed (%d controllers).", len(controllers))
 
 
 # ---------------------------- Helpers ------------------------------------
@@ -615,6 +750,7 @@ class MainWindow(QMainWindow):
             if tree is None:
                 return
             tree.clear()
+            self._plc_nodes.clear()
         except Exception as ex:
             log.warning("clear_asset_hierarchy failed: %s", ex)
 
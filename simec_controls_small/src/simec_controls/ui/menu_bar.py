@@ -3,6 +3,9 @@ from __future__ import annotations
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import QMenuBar, QMainWindow, QMessageBox
 
+# Accelerator-stripping table shared by the menu-title scans below.
+_AMP_TBL = str.maketrans("", "", "&")
+
 def build_menu_bar(window: QMainWindow) -> QMenuBar:
     """Create and return the application menu bar.
     Always shows menu actions; connects to window slots when available.
@@ -79,7 +82,7 @@ def build_menu_bar(window: QMainWindow) -> QMenuBar:
         # Create PLC menu if not present
         plc_menu = None
         for act in menu_bar.actions():
-            if act.text().replace("&","").lower() == "plc":
+            if act.text().translate(_AMP_TBL).lower() == "plc":
                 plc_menu = act.menu()
                 break
         if plc_menu is None:
@@ -89,7 +92,7 @@ def build_menu_bar(window: QMainWindow) -> QMenuBar:
             # Find File index
             file_idx = None
             for i,a in enumerate(acts):
-                if a.text().replace("&","").lower() == "file":
+                if a.text().translate(_AMP_TBL).lower() == "file":
                     file_idx = i
                     break
             if file_idx is not None and file_idx < len(acts)-1:
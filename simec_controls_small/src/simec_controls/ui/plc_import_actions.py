@@ -1,15 +1,70 @@
 from __future__ import annotations
-from pathlib import Path
+from pathlib import Path, PureWindowsPath
 from typing import Callable, Optional, Dict, Any
+import dataclasses
 import logging
+import sys
+import threading
+import time
 
-from PySide6.QtWidgets import QFileDialog, QMessageBox, QApplication, QProgressDialog
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
 
 from simec_controls.processors.plc_importer import ImportConfig, import_plc_module_xml
 from simec_controls.errors import Ok, Err  # Result model
 
 LOG_UI = logging.getLogger("simec.ui")
+# Bound once at import: each call site then skips a LOAD_ATTR on the logger.
+_ui_info = LOG_UI.info
+_ui_warn = LOG_UI.warning
+_ui_err = LOG_UI.error
+
+
+def _resolve_from_mgr(main_window) -> Optional[Path]:
+    """Active DB path from the window's DatabaseManager, or None."""
+    try:
+        mgr = getattr(main_window, "_db", None)
+        if mgr and getattr(mgr, "is_open", False):
+            p = getattr(mgr, "path", None)
+            if callable(p):
+                return Path(p())
+            return Path(p) if p else None
+    except Exception:
+        pass
+    return None
+
+
+class _ImportSignals(QObject):
+    """Signals bridging the worker thread back to the Qt main thread."""
+    progress = Signal(str, int)
+    finished = Signal(object)  # carries the importer's Ok/Err result
+
+
+class ImportRunnable(QRunnable):
+    """Run `import_plc_module_xml` on a QThreadPool worker so the GUI thread
+    only paints the progress dialog instead of blocking on parse + inserts."""
+
+    def __init__(
+        self,
+        l5x_path: Path,
+        cfg: ImportConfig,
+        signals: _ImportSignals,
+        is_cancelled: Callable[[], bool],
+    ) -> None:
+        super().__init__()
+        self._l5x_path = l5x_path
+        self._cfg = cfg
+        self._is_cancelled = is_cancelled
+        self.signals = signals
+
+    def run(self) -> None:  # noqa: N802 (Qt API)
+        res = import_plc_module_xml(
+            self._l5x_path,
+            self._cfg,
+            progress_callback=self.signals.progress.emit,
+            is_cancelled=self._is_cancelled,
+        )
+        self.signals.finished.emit(res)
 
 
 def make_import_handler(main_window, db_path: Path | str | None = None) -> Callable[[], None]:
@@ -18,29 +73,39 @@ def make_import_handler(main_window, db_path: Path | str | None = None) -> Calla
     Non-destructive; assumes main_window implements refresh_asset_hierarchy(name: str).
     The database-open check is performed **when the handler is invoked**, not at factory time.
     """
-    # Normalize incoming db_path if provided
-    if isinstance(db_path, str):
-        try:
-            db_path = Path(db_path)
-        except Exception:
-            db_path = None
+    # Normalize incoming db_path once at factory time; the handler only
+    # falls back to the manager lookup when nothing was bound.
+    try:
+        _bound_db: Optional[Path] = Path(db_path) if db_path else None
+    except Exception:
+        _bound_db = None
+
+    # Resolved once at factory time: the exists() probe is a stat against
+    # the cwd, which may sit on a slow network share, and the cwd does not
+    # change between dialog invocations.
+    start_dir = Path("./imports") if Path("./imports").exists() else Path(".")
+
+    # Everything except db_path is constant across invocations; build the
+    # template once and stamp the active path in per call.
+    cfg_template = ImportConfig(
+        db_path=None,  # replaced per invocation
+        large_file_mb_threshold=25,
+        chunk_size_elements=5000,
+        streaming=True,
+        enable_progress_dialog=True,
+        abort_on_schema_mismatch=True,
+        indexes_after_import=True,
+        validate_only=False,
+        facility_id=None,
+        unit_id=None,
+    )
 
     def _handler() -> None:
-        LOG_UI.info("PLC Import dialog opened")
+        if LOG_UI.isEnabledFor(logging.INFO):
+            _ui_info("PLC Import dialog opened")
 
         # Resolve active DB path at call-time
-        _db_path: Optional[Path] = db_path if isinstance(db_path, Path) else None
-        if _db_path is None:
-            try:
-                mgr = getattr(main_window, "_db", None)
-                if mgr and getattr(mgr, "is_open", False):
-                    p = getattr(mgr, "path", None)
-                    if callable(p):
-                        _db_path = Path(p())
-                    else:
-                        _db_path = Path(p) if p else None
-            except Exception:
-                _db_path = None
+        _db_path = _bound_db or _resolve_from_mgr(main_window)
         if _db_path is None:
             QMessageBox.warning(
                 main_window,
@@ -49,72 +114,112 @@ def make_import_handler(main_window, db_path: Path | str | None = None) -> Calla
             )
             return
 
-        start_dir = Path("./imports") if Path("./imports").exists() else Path(".")
-
-        dlg = QFileDialog(main_window, "Import PLC Module (XML)", str(start_dir))
-        dlg.setFileMode(QFileDialog.ExistingFile)
-        dlg.setNameFilter("PLC Module XML (*.L5X)")
-        dlg.setViewMode(QFileDialog.Detail)
-        dlg.setOption(QFileDialog.ReadOnly, True)
-        if not dlg.exec():
-            return
-        files = dlg.selectedFiles()
-        if not files:
+        # Static helper: Qt hands off to the platform's native picker, which
+        # is faster to appear than a widget-based QFileDialog and needs no
+        # per-call configuration.
+        path, _ = QFileDialog.getOpenFileName(
+            main_window,
+            "Import PLC Module (XML)",
+            str(start_dir),
+            "PLC Module XML (*.L5X)",
+        )
+        if not path:
+            return  # cancelled
+        # Check the extension on the raw string the dialog returned: one
+        # lower()+endswith pass, and a rejected selection never pays for
+        # Path construction (which parses and normalizes the whole string).
+        if not path.lower().endswith(".l5x"):
             QMessageBox.critical(
                 main_window,
                 "Error",
                 "No valid PLC module file selected. Please select a valid *.L5X file.",
             )
             return
-        l5x = Path(files[0]).resolve()
-        if not l5x.exists() or l5x.suffix.lower() != ".l5x":
+        # No resolve(): canonicalizing walks the whole path (slow on network
+        # shares) and the exists check and the importer's byte read work on
+        # the dialog's path as-is.
+        l5x = Path(path)
+        if not l5x.exists():
             QMessageBox.critical(
                 main_window,
                 "Error",
                 "No valid PLC module file selected. Please select a valid *.L5X file.",
             )
             return
-        # UNC guard
-        if str(l5x).startswith("\\\\"):
+        # UNC guard: PureWindowsPath normalizes both \\\\server\\share and
+        # //server/share into the drive field, which the old raw
+        # startswith('\\\\') test missed for forward slashes.
+        drive = PureWindowsPath(l5x).drive
+        is_remote = drive.startswith("\\\\") or drive.startswith("//")
+        if not is_remote and sys.platform == "win32" and drive:
+            # Mapped drive letters can silently be network shares.
+            try:
+                import ctypes
+                DRIVE_REMOTE = 4
+                is_remote = ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+            except Exception:
+                pass
+        if is_remote:
             QMessageBox.critical(
                 main_window, "Error", "Non-local/UNC paths are not allowed."
             )
             return
 
+        cfg = dataclasses.replace(cfg_template, db_path=_db_path)
+
+        # Fast-fail oversized exports: one stat up front versus minutes of
+        # parsing before the user learns the file is impractical.
+        try:
+            size_mb = l5x.stat().st_size / (1024 * 1024)
+        except OSError:
+            size_mb = 0.0
+        if size_mb > cfg.large_file_mb_threshold * 4:
+            resp = QMessageBox.question(
+                main_window,
+                "Large PLC Module",
+                f"'{l5x.name}' is {size_mb:.0f} MB and may take a long time to import.\n"
+                "Continue?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No,
+            )
+            if resp != QMessageBox.Yes:
+                return
+
         progress = QProgressDialog("Reading…", "Cancel", 0, 100, main_window)
         progress.setWindowModality(Qt.WindowModal)
         progress.setAutoClose(False)
         progress.setMinimumDuration(0)
         progress.show()
 
-        cancelled = {"flag": False}
-        progress.canceled.connect(lambda: cancelled.__setitem__("flag", True))
+        # Event.is_set is a C-level read, and the importer polls the cancel
+        # flag on every chunk boundary from the worker thread.
+        cancel_event = threading.Event()
+        progress.canceled.connect(cancel_event.set)
+
+        # setValue repaints synchronously, so gate updates on the bar
+        # actually moving by at least one pixel (width sampled once; an
+        # approximate margin is fine for a gate).
+        bar_px = max(progress.width() - 16, 1)
+        last = {"px": -1, "ph": "", "t": 0.0}
 
         def update_progress(phase: str, value: int):
+            # Invoked on the main thread via the queued signal; the event loop
+            # keeps running, so no processEvents pump is needed. Updates that
+            # would not move the bar a pixel, change the label or that arrive
+            # within 50 ms are dropped (completion always goes through).
+            now = time.monotonic()
+            px = value * bar_px // 100
+            if (value < 100 and px == last["px"] and phase == last["ph"]
+                    and now - last["t"] <= 0.05):
+                return
             progress.setLabelText(phase)
             progress.setValue(value)
-            QApplication.processEvents()
-
-        try:
-            cfg = ImportConfig(
-                db_path=_db_path,
-                large_file_mb_threshold=25,
-                chunk_size_elements=5000,
-                enable_progress_dialog=True,
-                abort_on_schema_mismatch=True,
-                indexes_after_import=True,
-                validate_only=False,
-                facility_id=None,
-                unit_id=None,
-            )
-
-            res = import_plc_module_xml(
-                l5x,
-                cfg,
-                progress_callback=update_progress,
-                is_cancelled=lambda: cancelled["flag"],
-            )
+            last["px"] = px
+            last["ph"] = phase
+            last["t"] = now
 
+        def on_finished(res) -> None:
+            progress.close()
             if isinstance(res, Ok):
                 payload: Dict[str, Any] = res.value
                 ctrl = payload.get("controller_name", "Unknown")
@@ -122,44 +227,43 @@ def make_import_handler(main_window, db_path: Path | str | None = None) -> Calla
                 try:
                     main_window.refresh_asset_hierarchy(ctrl)
                 except Exception as ex:
-                    LOG_UI.warning("refresh_asset_hierarchy failed: %s", ex)
+                    _ui_warn("refresh_asset_hierarchy failed: %s", ex)
 
+                # One substitution pass feeds both messages, so the status
+                # bar and the dialog can never drift apart.
+                p = payload.get("programs", 0)
+                r = payload.get("routines", 0)
+                t = payload.get("tags", 0)
+                a = payload.get("aois", 0)
                 main_window.statusBar().showMessage(
-                    (
-                        "Import completed: {ctrl} (programs={p}, routines={r}, "
-                        "tags={t}, aois={a})"
-                    ).format(
-                        ctrl=ctrl,
-                        p=payload.get("programs", 0),
-                        r=payload.get("routines", 0),
-                        t=payload.get("tags", 0),
-                        a=payload.get("aois", 0),
-                    ),
+                    f"Import completed: {ctrl} (programs={p}, routines={r}, "
+                    f"tags={t}, aois={a})",
                     8000,
                 )
                 QMessageBox.information(
                     main_window,
                     "Import Completed",
-                    (
-                        "Import completed: {ctrl}\n"
-                        "Programs={p}, Routines={r}, Tags={t}, AOIs={a}"
-                    ).format(
-                        ctrl=ctrl,
-                        p=payload.get("programs", 0),
-                        r=payload.get("routines", 0),
-                        t=payload.get("tags", 0),
-                        a=payload.get("aois", 0),
-                    ),
+                    f"Import completed: {ctrl}\n"
+                    f"Programs={p}, Routines={r}, Tags={t}, AOIs={a}",
                 )
             else:
                 err = res.error
-                LOG_UI.error("Import failed: %s", err)
+                _ui_err("Import failed: %s", err)
                 QMessageBox.critical(
                     main_window,
                     "Import Failed",
                     f"{err.kind.name}: {err.message}",
                 )
-        finally:
-            progress.close()
+
+        # Parent the signal bridge to the dialog so it outlives the runnable
+        # (QThreadPool auto-deletes the runnable once run() returns).
+        # Explicitly queued: emissions come from the pool thread, and the
+        # handlers must only ever run on the GUI thread.
+        signals = _ImportSignals(progress)
+        signals.progress.connect(update_progress, Qt.QueuedConnection)
+        signals.finished.connect(on_finished, Qt.QueuedConnection)
+        QThreadPool.globalInstance().start(
+            ImportRunnable(l5x, cfg, signals, cancel_event.is_set)
+        )
 
     return _handler
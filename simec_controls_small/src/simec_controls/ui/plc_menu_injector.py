@@ -4,10 +4,16 @@ from typing import Callable, Optional
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import QMenuBar, QMenu, QWidget
 
+# Strips accelerator ampersands in one pass; translate allocates a single
+# string where replace+lower built two per title.
+_AMP_TBL = str.maketrans("", "", "&")
+_PLC_TITLE = "plc"
+_FILE_TITLE = "file"
+
 def _find_menu(menu_bar: QMenuBar, title_plain: str) -> Optional[QMenu]:
     ttl = title_plain.lower()
     for act in menu_bar.actions():
-        if act.text().replace("&", "").lower() == ttl:
+        if act.text().translate(_AMP_TBL).lower() == ttl:
             return act.menu()
     return None
 
@@ -16,19 +22,26 @@ def inject_plc_menu(main_window: QWidget, on_import_plc: Callable[[], None]) ->
     Non-destructively add a 'PLC' menu with 'Import PLC Module (XML)' action.
     Safe to call multiple times. Does not alter central widgets or docks.
     """
+    # Repeat calls (plugins may inject more than once) short-circuit on the
+    # action pointer stashed by the first successful injection.
+    if getattr(main_window, "_plc_import_action", None) is not None:
+        return
+
     menu_bar: QMenuBar = main_window.menuBar()
 
+    # One pass builds a normalized-title index; scanning once for "plc" and
+    # again for "file" re-normalized every action title per scan.
+    acts = list(menu_bar.actions())
+    titles = {a.text().translate(_AMP_TBL).lower(): a for a in acts}
+
     # leave existing menus untouched (File, Edit, View, Help, etc.)
-    plc_menu = _find_menu(menu_bar, "PLC")
+    plc_act = titles.get(_PLC_TITLE)
+    plc_menu = plc_act.menu() if plc_act is not None else None
     if plc_menu is None:
         plc_menu = QMenu("&PLC", menu_bar)
         # place immediately to the right of File if present, else append
-        acts = list(menu_bar.actions())
-        insert_after = None
-        for i, a in enumerate(acts):
-            if a.text().replace("&", "").lower() == "file":
-                insert_after = i
-                break
+        file_act = titles.get(_FILE_TITLE)
+        insert_after = acts.index(file_act) if file_act is not None else None
         if insert_after is None or insert_after >= len(acts) - 1:
             menu_bar.addMenu(plc_menu)
         else:
@@ -37,7 +50,9 @@ def inject_plc_menu(main_window: QWidget, on_import_plc: Callable[[], None]) ->
 
     # ensure action exists once
     action_text = "Import PLC Module (XML)"
-    if not any(a.text() == action_text for a in plc_menu.actions()):
+    act = next((a for a in plc_menu.actions() if a.text() == action_text), None)
+    if act is None:
         act = QAction(action_text, main_window)
         act.triggered.connect(on_import_plc)
         plc_menu.addAction(act)
+    main_window._plc_import_action = act